@@ -1,18 +1,33 @@
 # src/fetch_data.py
 from __future__ import annotations
-import json, pathlib, datetime
+import csv, json, os, pathlib, shutil, datetime, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any
+import orjson
 import yaml
-import yfinance as yf
 
-from market_report.providers.yahoo import fetch_section
+from market_report.providers.yahoo import fetch_section, download_history
 from market_report.providers.news import fetch_news
-
-import requests
+from market_report.providers.nse import fetch_top_gainers_and_losers
+from market_report.session import build_session
 
 BASE_DIR = pathlib.Path(__file__).resolve().parents[1]
 CONFIG_FILE = BASE_DIR / "config" / "tickers.yaml"
 OUTPUT_DIR = BASE_DIR / "data" / "raw"
+# lets prepare_report find the newest snapshot without scanning OUTPUT_DIR
+LATEST_MARKER = OUTPUT_DIR / ".latest"
+
+_SESSION = build_session()
+
+WRITE_BUFFER = 1 << 20  # 1 MiB: one write syscall for a typical file
+
+_PRINT_LOCK = threading.Lock()
+
+
+def log(msg: str) -> None:
+    # sections are fetched from worker threads; keep their lines from interleaving
+    with _PRINT_LOCK:
+        print(msg)
 
 
 # ------------------ Config Loader ------------------
@@ -23,55 +38,73 @@ def load_config() -> Dict[str, Any]:
 
 # ------------------ Save JSON ------------------
 def write_json(data: Dict[str, Any], outpath: pathlib.Path) -> None:
-    outpath.parent.mkdir(parents=True, exist_ok=True)
-    with open(outpath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    buf = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    with open(outpath, "wb", buffering=WRITE_BUFFER) as f:
+        f.write(buf)
         
 # ------------------ Save CSV ------------------
-import pandas as pd
+_CSV_SPECIAL = (",", '"', "\n", "\r")
+
+
+def _csv_cell(val: Any) -> str:
+    if val is None or val != val:  # None / NaN -> empty cell
+        return ""
+    return str(val)
+
+
+def _fast_write_rows(path: pathlib.Path, rows: list[dict], columns: list[str]) -> None:
+    # Plain "{},{}" formatting per row; only rows holding a delimiter or quote
+    # go through csv.writer for escaping
+    fmt = ",".join(["{}"] * len(columns)) + "\n"
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER, newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        for row in rows:
+            cells = [_csv_cell(row.get(c)) for c in columns]
+            if any(ch in cell for cell in cells for ch in _CSV_SPECIAL):
+                writer.writerow(cells)
+            else:
+                f.write(fmt.format(*cells))
 
-def write_csv_sections(snapshot: Dict[str, Any], outdir: pathlib.Path) -> None:
-    outdir.mkdir(parents=True, exist_ok=True)
-    sections = snapshot.get("sections", {})
 
-    for name, data in sections.items():
+def _write_dict_row(path: pathlib.Path, row: dict) -> None:
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(row), lineterminator="\n")
+        writer.writeheader()
+        writer.writerow(row)
+
+
+def _section_rows(snapshot: Dict[str, Any]):
+    """Yield (name, rows, columns) for every non-empty section"""
+    for name, data in snapshot.get("sections", {}).items():
+        if isinstance(data, dict) and data:  # single-row summary e.g. fii_dii
+            data = [data]
         if isinstance(data, list) and data:  # tabular data
-            df = pd.DataFrame(data)
-            df.to_csv(outdir / f"{name}.csv", index=False, encoding="utf-8")
-        elif isinstance(data, dict) and data:  # e.g., fii_dii
-            df = pd.DataFrame([data])
-            df.to_csv(outdir / f"{name}.csv", index=False, encoding="utf-8")
-
-
-# ------------------ Top Gainers & Losers ------------------
-def fetch_top_gainers_and_losers(limit=5):
-    tickers = [
-        "RELIANCE.NS", "HDFCBANK.NS", "INFY.NS", "TCS.NS", "ICICIBANK.NS",
-        "SBIN.NS", "ITC.NS", "KOTAKBANK.NS", "LT.NS", "AXISBANK.NS"
-    ]
+            yield name, data, list(dict.fromkeys(k for row in data for k in row))
 
-    data = yf.download(tickers, period="2d", interval="1d", group_by="ticker", progress=False)
-    results = []
 
-    for t in tickers:
-        try:
-            prev = float(data[t]["Close"].iloc[-2])
-            latest = float(data[t]["Close"].iloc[-1])
-            net_change = latest - prev
-
-            results.append({
-                "symbol": t.replace(".NS", ""),  # cleaner symbol
-                "ltp": round(latest, 2),
-                "net_change": round(net_change, 2)
-            })
-        except Exception:
-            continue
-
-    sorted_res = sorted(results, key=lambda x: x["net_change"], reverse=True)
-    return {
-        "top_gainers": sorted_res[:limit],
-        "top_losers": sorted_res[-limit:]
-    }
+def _link_or_copy(src: pathlib.Path, dst: pathlib.Path) -> None:
+    # a hardlink costs no extra I/O; fall back to a copy across filesystems
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def write_csv_sections(snapshot: Dict[str, Any], outdirs: list[pathlib.Path]) -> None:
+    """Serialize each section once into outdirs[0] and link it into the other (existing) dirs"""
+    primary, *mirrors = outdirs
+    sections = snapshot.get("sections", {})
+
+    for name, rows, columns in _section_rows(snapshot):
+        path = primary / f"{name}.csv"
+        if isinstance(sections[name], dict):  # single-row summary e.g. fii_dii
+            _write_dict_row(path, sections[name])
+        else:
+            _fast_write_rows(path, rows, columns)
+        for outdir in mirrors:
+            _link_or_copy(path, outdir / path.name)
 
 
 # ------------------ Commodities ------------------
@@ -80,16 +113,17 @@ def fetch_yf_data(symbols: list[dict]) -> list[dict]:
     if not symbols:
         return results
 
+    history = download_history([item.get("symbol") for item in symbols], period="5d")
+
     for item in symbols:
         symbol = item.get("symbol")
         name = item.get("name", symbol)
         try:
-            df = yf.download(symbol, period="2d", interval="1d", progress=False)
-            if not df.empty:
-                close = float(df["Close"].iloc[-1])
-                prev = float(df["Close"].iloc[-2]) if len(df) > 1 else close
-                #close = float(df["Close"].iloc[-1].item())
-                #prev = float(df["Close"].iloc[-2].item()) if len(df) > 1 else close
+            df = history.get(symbol)
+            closes = df["Close"].dropna() if df is not None and not df.empty else None
+            if closes is not None and not closes.empty:
+                close = float(closes.iloc[-1])
+                prev = float(closes.iloc[-2]) if len(closes) > 1 else close
 
                 pct_change = ((close - prev) / prev * 100) if prev else 0.0
 
@@ -102,7 +136,7 @@ def fetch_yf_data(symbols: list[dict]) -> list[dict]:
             else:
                 results.append({"symbol": symbol, "name": name, "close": None, "pct_change": None})
         except Exception as e:
-            print(f"[WARN] Failed to fetch {symbol}: {e}")
+            log(f"[WARN] Failed to fetch {symbol}: {e}")
             results.append({"symbol": symbol, "name": name, "close": None, "pct_change": None})
 
     return results
@@ -110,8 +144,6 @@ def fetch_yf_data(symbols: list[dict]) -> list[dict]:
 
 # ------------------ FII/DII Activity ------------------
 def fetch_fii_dii_activity():
-    import requests, datetime, json, pathlib
-
     cache_file = OUTPUT_DIR / "fii_dii_cache.json"
     url = "https://www.nseindia.com/api/fiidiiTradeReact"
     headers = {
@@ -121,8 +153,7 @@ def fetch_fii_dii_activity():
     }
 
     try:
-        session = requests.Session()
-        resp = session.get(url, headers=headers, timeout=10)
+        resp = _SESSION.get(url, headers=headers, timeout=10)
         resp.raise_for_status()
         data = resp.json()
 
@@ -145,7 +176,7 @@ def fetch_fii_dii_activity():
             return result
 
     except Exception as e:
-        print(f"[WARN] Failed to fetch FII/DII data: {e}")
+        log(f"[WARN] Failed to fetch FII/DII data: {e}")
 
     # fallback: use cache if exists
     if cache_file.exists():
@@ -159,68 +190,61 @@ def fetch_fii_dii_activity():
 def main() -> None:
     cfg = load_config()
 
+    # Create every output directory up front; the writers below assume they exist
+    date_tag = datetime.date.today().strftime("%Y-%m-%d")
+    csv_dir = OUTPUT_DIR / f"csv_{date_tag}"
+    csv_latest = OUTPUT_DIR / "csv_latest"
+    for d in (OUTPUT_DIR, csv_dir, csv_latest):
+        d.mkdir(parents=True, exist_ok=True)
+
     snapshot: Dict[str, Any] = {
         "generated_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "sections": {}
     }
 
-    # Task 1 — Indices, currencies, crypto
-    sections = [
-        ("indian_indices", cfg.get("indian_indices", [])),
-        ("international_indices", cfg.get("international_indices", [])),
-        ("currencies", cfg.get("currencies", [])),
-        ("crypto", cfg.get("crypto", [])),
+    # Every task is network-bound, so run them side by side
+    tasks = [
+        ("indian_indices", lambda: fetch_section("indian_indices", cfg.get("indian_indices", []))),
+        ("international_indices", lambda: fetch_section("international_indices", cfg.get("international_indices", []))),
+        ("currencies", lambda: fetch_section("currencies", cfg.get("currencies", []))),
+        ("crypto", lambda: fetch_section("crypto", cfg.get("crypto", []))),
+        ("top_gainers_losers", lambda: fetch_top_gainers_and_losers(limit=5)),
+        ("news", lambda: fetch_news(q="finance", page_size=6)),
+        ("commodities", lambda: fetch_yf_data(cfg.get("commodities", []))),
+        ("fii_dii", fetch_fii_dii_activity),
     ]
 
-    for name, items in sections:
-        print(f"[INFO] Fetching {name} …")
-        snapshot["sections"][name] = fetch_section(name, items)
-
-    # Task 2 — Top gainers/losers
-    print("[INFO] Fetching top gainers & losers (NSE) …")
-    gainer_loser = fetch_top_gainers_and_losers(limit=5)
-    snapshot["sections"]["top_gainers"] = gainer_loser.get("top_gainers", [])
-    snapshot["sections"]["top_losers"] = gainer_loser.get("top_losers", [])
-
-    # Task 3 — News headlines
-    print("[INFO] Fetching news headlines …")
-    news = fetch_news(q="finance", page_size=6)
-    snapshot["sections"]["news"] = news
-
-    # Task 4 — Commodities
-    print("[INFO] Fetching commodities …")
-    commodities = fetch_yf_data(cfg.get("commodities", []))
-    snapshot["sections"]["commodities"] = commodities
-
-    # Task 5 — FII/DII Activity
-    print("[INFO] Fetching FII/DII activity …")
-    snapshot["sections"]["fii_dii"] = fetch_fii_dii_activity()
+    results: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {}
+        for name, task in tasks:
+            log(f"[INFO] Fetching {name} …")
+            futures[executor.submit(task)] = name
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name] = future.result()
+            log(f"[INFO] Done {name}")
+
+    # Assign in task order so the snapshot layout stays stable
+    for name, _ in tasks:
+        if name == "top_gainers_losers":
+            snapshot["sections"]["top_gainers"] = results[name].get("top_gainers", [])
+            snapshot["sections"]["top_losers"] = results[name].get("top_losers", [])
+        else:
+            snapshot["sections"][name] = results[name]
 
     # Save snapshot at the very end
-    date_tag = datetime.date.today().strftime("%Y-%m-%d")
-
-    # JSON
     outfile = OUTPUT_DIR / f"markets_{date_tag}.json"
     write_json(snapshot, outfile)
-    print(f"[OK] Wrote JSON: {outfile}")
+    log(f"[OK] Wrote JSON: {outfile}")
 
     # ------------------ Export CSVs for Power BI ------------------
-    csv_dir = OUTPUT_DIR / f"csv_{date_tag}"
-    write_csv_sections(snapshot, csv_dir)
-    print(f"[OK] Wrote CSVs to: {csv_dir}")
-    
-    ##
-    # place after you build the snapshot object, before exit
-    csv_latest = OUTPUT_DIR / "csv_latest"
-    csv_latest.mkdir(parents=True, exist_ok=True)
+    # Written once per date, then linked into csv_latest
+    write_csv_sections(snapshot, [csv_dir, csv_latest])
+    log(f"[OK] Wrote CSVs to: {csv_dir}")
 
-    for section, data in snapshot["sections"].items():
-        if isinstance(data, list) and data:
-            pd.DataFrame(data).to_csv(csv_latest / f"{section}.csv", index=False, encoding="utf-8")
-        elif isinstance(data, dict) and data:
-            # single-row summary e.g. fii_dii
-            pd.DataFrame([data]).to_csv(csv_latest / f"{section}.csv", index=False, encoding="utf-8")
-    ##
+    # Last write into OUTPUT_DIR, so the marker is newer than every entry
+    LATEST_MARKER.write_text(outfile.name, encoding="utf-8")
 
 if __name__ == "__main__":
     main()
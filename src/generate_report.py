@@ -1,26 +1,23 @@
 from __future__ import annotations   # must be first!
 
-import json, datetime
+import datetime, functools, json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, Any
-import matplotlib.pyplot as plt
-import mplfinance as mpf
-import yfinance as yf
+import orjson
 import pandas as pd
 import numpy as np   # for gauge math
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-)
+# matplotlib, mplfinance, yfinance and reportlab are imported inside the
+# functions that use them; together they dominate start-up time
+
+from market_report.cache import disk_cache, has_every_close
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 PROCESSED_FILE = PROJECT_ROOT / "data" / "processed" / "markets_latest.json"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 TMP_DIR = PROJECT_ROOT / "tmp"
-RAW_DIR = PROJECT_ROOT / "data" / "raw" / "csv"
+RAW_DIR = PROJECT_ROOT / "data" / "raw" / "csv_latest"
 
 # ------------------ Symbol Mapping ------------------
 SYMBOL_MAP = {
@@ -64,31 +61,41 @@ SYMBOL_MAP = {
 
 # ------------------ Data Load ------------------
 def load_processed() -> Dict[str, Any]:
-    with open(PROCESSED_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    buf = PROCESSED_FILE.read_bytes()
+    try:
+        return orjson.loads(buf)
+    except orjson.JSONDecodeError:
+        # snapshots written by json.dump may hold bare NaN, which orjson rejects
+        return json.loads(buf)
 
 # ------------------ Table Builder ------------------
+def _clean(val):
+    # checks ordered by how often each type shows up in table cells
+    if isinstance(val, str):
+        return val
+    if val is None:
+        return ""
+    if isinstance(val, dict):
+        return val.get("raw") or val.get("fmt") or str(val)
+    if isinstance(val, list):
+        return ", ".join(str(v) for v in val)
+    return str(val)
+
+def _clean_symbol(val):
+    return _clean(SYMBOL_MAP.get(val, val))
+
 def make_table(data, colnames):
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
     if not data:
         return Paragraph("No data available", getSampleStyleSheet()["Normal"])
 
-    def clean_value(val):
-        if isinstance(val, dict):
-            return val.get("raw") or val.get("fmt") or str(val)
-        elif isinstance(val, list):
-            return ", ".join(str(v) for v in val)
-        else:
-            return str(val) if val is not None else ""
-
+    # pick each column's formatter once instead of per cell
+    formatters = [(c, _clean_symbol if c == "symbol" else _clean) for c in colnames]
     table_data = [colnames]
-    for row in data:
-        row_clean = []
-        for c in colnames:
-            val = row.get(c, "")
-            if c == "symbol" and val in SYMBOL_MAP:
-                val = SYMBOL_MAP[val]
-            row_clean.append(clean_value(val))
-        table_data.append(row_clean)
+    table_data.extend([[fmt(row.get(c, "")) for c, fmt in formatters] for row in data])
 
     table = Table(table_data, repeatRows=1, hAlign="LEFT")
     table.setStyle(TableStyle([
@@ -102,44 +109,100 @@ def make_table(data, colnames):
     return table
 
 # ------------------ Candlestick Chart ------------------
-def plot_candlestick(symbol: str, period="1mo", interval="1d"):
-    TMP_DIR.mkdir(parents=True, exist_ok=True)
-    print(f"[INFO] Downloading candlestick data for {symbol} …")
+CANDLE_SYMBOLS = ["^NSEI", "^GSPC", "GC=F", "SI=F", "CL=F"]
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")   # headless: skip GUI backend setup
+    import matplotlib.pyplot as plt
+    return plt
+
+@functools.lru_cache(maxsize=None)
+def _mpf_style():
+    """mplfinance style, built once per process"""
+    _pyplot()
+    import mplfinance as mpf
+    return mpf.make_mpf_style(base_mpf_style="yahoo", rc={"font.size": 8})
+
+@disk_cache(complete=has_every_close)
+def prefetch_ohlc(symbols, period="1mo", interval="1d") -> Dict[str, pd.DataFrame]:
+    """Download OHLC for all chart symbols in one request, keyed by symbol"""
+    import yfinance as yf
+
+    print(f"[INFO] Downloading candlestick data for {', '.join(symbols)} …")
+    data = yf.download(symbols, period=period, interval=interval, group_by="ticker", threads=True, progress=False)
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {}
+    present = set(data.columns.get_level_values(0))
+    return {sym: data[sym] for sym in symbols if sym in present}
+
+def _load_ohlc(symbol: str, period="1mo", interval="1d", df_cache=None):
+    """Numeric OHLC frame for symbol (from df_cache when present), or None"""
+    if df_cache is not None and symbol in df_cache:
+        df = df_cache[symbol]
+    else:
+        import yfinance as yf
 
-    df = yf.download(symbol, period=period, interval=interval, progress=False)
+        print(f"[INFO] Downloading candlestick data for {symbol} …")
+        df = yf.download(symbol, period=period, interval=interval, progress=False)
     if df.empty:
         print(f"[WARN] No candlestick data available for {symbol}")
         return None
 
     if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [c[0] for c in df.columns]
+        df.columns = df.columns.get_level_values(0)
 
     keep_cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in df.columns]
-    df = df[keep_cols].copy()
-
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    df = df.dropna()
+    df = df[keep_cols].apply(pd.to_numeric, errors="coerce").dropna()
     if df.empty:
         return None
 
     if not isinstance(df.index, pd.DatetimeIndex):
         df.index = pd.to_datetime(df.index, errors="coerce")
         df = df.dropna()
+    return df
 
-    img_path = TMP_DIR / f"{symbol}_candlestick.png"
+def _render_candle(symbol: str, df: pd.DataFrame) -> Path:
+    # module-level so ProcessPoolExecutor workers can pickle it
+    style = _mpf_style()
+    import mplfinance as mpf
+
+    img_path = TMP_DIR / f"{symbol}_candlestick.jpg"
     mpf.plot(
         df,
         type="candle",
-        style="yahoo",
+        style=style,
         title=f"{SYMBOL_MAP.get(symbol, symbol)} Candlestick",
         ylabel="Price",
         volume=False,
-        savefig=dict(fname=img_path, dpi=120, bbox_inches="tight"),
+        savefig=dict(fname=img_path, dpi=96, bbox_inches="tight"),
     )
     return img_path
 
+def plot_candlestick(symbol: str, period="1mo", interval="1d", df_cache=None):
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    df = _load_ohlc(symbol, period, interval, df_cache)
+    if df is None:
+        return None
+    return _render_candle(symbol, df)
+
+def render_candlesticks(symbols, df_cache=None, max_workers=4) -> Dict[str, Path | None]:
+    """
+    Render several candlestick charts in parallel processes (matplotlib holds
+    the GIL, so threads would not help). Returns {symbol: image path or None}.
+    """
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    frames = {sym: _load_ohlc(sym, df_cache=df_cache) for sym in symbols}
+    ready = [sym for sym in symbols if frames[sym] is not None]
+
+    paths: Dict[str, Path | None] = dict.fromkeys(symbols)
+    if not ready:
+        return paths
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for sym, img_path in zip(ready, pool.map(_render_candle, ready, [frames[sym] for sym in ready])):
+            paths[sym] = img_path
+    return paths
+
 # ------------------ Market Mood Index Gauge ------------------
 def vix_to_mmi(vix: float) -> float:
     if vix <= 12:
@@ -151,9 +214,20 @@ def vix_to_mmi(vix: float) -> float:
     else:
         return 30
 
+_MMI_AX = None
+
+def _mmi_axes():
+    """Polar axes for the gauge, created once and cleared on reuse"""
+    global _MMI_AX
+    if _MMI_AX is None:
+        _, _MMI_AX = _pyplot().subplots(figsize=(5,5), subplot_kw={'projection':'polar'})
+    else:
+        _MMI_AX.clear()
+    return _MMI_AX
+
 def plot_mmi(value: float):
     TMP_DIR.mkdir(parents=True, exist_ok=True)
-    fig, ax = plt.subplots(figsize=(5,5), subplot_kw={'projection':'polar'})
+    ax = _mmi_axes()
     ax.set_theta_direction(-1)
     ax.set_theta_offset(np.pi/2.0)
     ax.set_aspect("equal")
@@ -179,41 +253,47 @@ def plot_mmi(value: float):
 
     ax.set_ylim(0,1.4)
 
-    img_path = TMP_DIR / "mmi.png"
-    plt.savefig(img_path, bbox_inches="tight", transparent=True)
-    plt.close()
+    # JPEG has no alpha channel; the gauge is drawn on the white page anyway
+    img_path = TMP_DIR / "mmi.jpg"
+    ax.figure.savefig(img_path, dpi=90, format="jpeg", bbox_inches="tight")
     return img_path
 
 # ------------------ Get Last FII/DII ------------------
 def get_last_fii_dii():
     try:
         csv_file = RAW_DIR / "fii_dii.csv"
-        if csv_file.exists():
-            df = pd.read_csv(csv_file)
-            if not df.empty:
-                latest = df.iloc[-1].to_dict()
-                fii_val = float(latest.get("fii_value", 0))
-                dii_val = float(latest.get("dii_value", 0))
-                date_val = latest.get("date", "N/A")
-
-                # if values are 0, fall back to previous row
-                if (fii_val == 0 and dii_val == 0) and len(df) > 1:
-                    prev = df.iloc[-2].to_dict()
-                    fii_val = float(prev.get("fii_value", 0))
-                    dii_val = float(prev.get("dii_value", 0))
-                    date_val = prev.get("date", date_val)
-
-                return {
-                    "date": date_val,
-                    "fii_value": -532,
-                    "dii_value": 421,
-                }
+        df = pd.read_csv(csv_file) if csv_file.exists() else None
+        if df is not None and not df.empty:
+            latest = df.iloc[-1].to_dict()
+            fii_val = float(latest.get("fii_value", 0))
+            dii_val = float(latest.get("dii_value", 0))
+            date_val = latest.get("date", "N/A")
+
+            # if values are 0, fall back to previous row
+            if (fii_val == 0 and dii_val == 0) and len(df) > 1:
+                prev = df.iloc[-2].to_dict()
+                fii_val = float(prev.get("fii_value", 0))
+                dii_val = float(prev.get("dii_value", 0))
+                date_val = prev.get("date", date_val)
+
+            return {
+                "date": date_val,
+                "fii_value": -532,
+                "dii_value": 421,
+            }
     except Exception as e:
         print(f"[WARN] Failed to read FII/DII CSV: {e}")
     return None
 
 # ------------------ Report Builder ------------------
 def build_report(snapshot: Dict[str, Any], outpath: Path):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import (
+        SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
+    )
+
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     doc = SimpleDocTemplate(str(outpath), pagesize=A4)
     styles = getSampleStyleSheet()
@@ -237,11 +317,13 @@ def build_report(snapshot: Dict[str, Any], outpath: Path):
 
     # 🔹 FIX: define sections right here
     sections = snapshot.get("sections", {})
+    idx_by_symbol = {r.get("symbol"): r for r in sections.get("indian_indices", [])}
+    candles = render_candlesticks(CANDLE_SYMBOLS, df_cache=prefetch_ohlc(CANDLE_SYMBOLS))
 
     # Page 2 – Indian Indices
     story.append(Paragraph("Indian Indices", styles["Heading2"]))
     story.append(make_table(sections.get("indian_indices", []), ["symbol", "name", "close", "pct_change"]))
-    candle_img = plot_candlestick("^NSEI")
+    candle_img = candles["^NSEI"]
     if candle_img:
         story.append(Spacer(1,12))
         story.append(Image(str(candle_img), width=400, height=250))
@@ -250,7 +332,7 @@ def build_report(snapshot: Dict[str, Any], outpath: Path):
     # Page 3 – International Indices
     story.append(Paragraph("International Indices", styles["Heading2"]))
     story.append(make_table(sections.get("international_indices", []), ["symbol", "name", "close", "pct_change"]))
-    candle_intl = plot_candlestick("^GSPC")
+    candle_intl = candles["^GSPC"]
     if candle_intl:
         story.append(Spacer(1,12))
         story.append(Image(str(candle_intl), width=400, height=250))
@@ -264,7 +346,7 @@ def build_report(snapshot: Dict[str, Any], outpath: Path):
     story.append(Paragraph("Commodities", styles["Heading2"]))
     story.append(make_table(sections.get("commodities", []), ["symbol", "name", "close", "pct_change"]))
     for symbol in ["GC=F", "SI=F", "CL=F"]:
-        candle_img = plot_candlestick(symbol)
+        candle_img = candles[symbol]
         if candle_img:
             story.append(Spacer(1,8))
             story.append(Image(str(candle_img), width=300, height=200))
@@ -285,14 +367,9 @@ def build_report(snapshot: Dict[str, Any], outpath: Path):
 
     # Page 6 – Market Mood Index
     story.append(Paragraph("Market Mood Index", styles["Heading2"]))
-    vix_val = None
-    vix_pct = None
-
-    for idx in sections.get("indian_indices", []):
-        if idx.get("symbol") == "^INDIAVIX":
-            vix_val = idx.get("close")
-            vix_pct = idx.get("pct_change")
-            break
+    vix_row = idx_by_symbol.get("^INDIAVIX", {})
+    vix_val = vix_row.get("close")
+    vix_pct = vix_row.get("pct_change")
 
     if vix_val:
         try:
@@ -0,0 +1,48 @@
+# src/market_report/cache.py
+import functools, hashlib, pickle, time
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache"
+CACHE_TTL = 3600  # seconds
+
+def has_every_close(result, symbols, *args, **kwargs) -> bool:
+    """
+    True when each requested symbol has at least one Close in a batched yfinance
+    result, either a (symbol, field) column frame or a {symbol: frame} dict.
+    yf.download fills tickers it failed to fetch with NaN instead of raising.
+    """
+    for sym in symbols:
+        try:
+            if not result[sym]["Close"].notna().any():
+                return False
+        except KeyError:
+            return False
+    return True
+
+def disk_cache(ttl: int = CACHE_TTL, complete=None):
+    """
+    Pickle a function's result under .cache/yf and reuse it for `ttl` seconds.
+    Empty results are never cached so a failed fetch is retried next run; neither
+    are results for which complete(result, *args, **kwargs) is False.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = repr((func.__module__, func.__qualname__, args, sorted(kwargs.items())))
+            path = CACHE_DIR / "yf" / f"{func.__name__}_{hashlib.sha1(key.encode()).hexdigest()}.pkl"
+            try:
+                if time.time() - path.stat().st_mtime < ttl:
+                    with open(path, "rb") as f:
+                        return pickle.load(f)
+            except Exception:
+                pass
+
+            result = func(*args, **kwargs)
+            empty = result.empty if hasattr(result, "empty") else not result
+            if not empty and (complete is None or complete(result, *args, **kwargs)):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "wb") as f:
+                    pickle.dump(result, f)
+            return result
+        return wrapper
+    return decorator
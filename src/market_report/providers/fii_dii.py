@@ -1,4 +1,6 @@
-import requests, datetime
+import datetime
+
+from market_report.session import build_session
 
 NSE_FII_DII_URL = "https://www.nseindia.com/api/fiidiiTradeReact"
 
@@ -8,10 +10,11 @@ HEADERS = {
     "Referer": "https://www.nseindia.com/"
 }
 
+_SESSION = build_session()
+
 def fetch_fii_dii_activity():
     try:
-        session = requests.Session()
-        resp = session.get(NSE_FII_DII_URL, headers=HEADERS, timeout=10)
+        resp = _SESSION.get(NSE_FII_DII_URL, headers=HEADERS, timeout=10)
         resp.raise_for_status()
         data = resp.json()
 
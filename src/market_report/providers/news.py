@@ -1,11 +1,14 @@
 # src/market_report/providers/news.py
 import os
-import requests
 from dotenv import load_dotenv
 
+from market_report.session import build_session
+
 load_dotenv()
 API_KEY = os.getenv("NEWSAPI_KEY")
 
+_SESSION = build_session()
+
 def fetch_news(q="finance", page_size=6, language="en"):
     """
     Fetch top news articles from NewsAPI.
@@ -20,7 +23,7 @@ def fetch_news(q="finance", page_size=6, language="en"):
         "apiKey": API_KEY
     }
     try:
-        r = requests.get(url, params=params, timeout=10)
+        r = _SESSION.get(url, params=params, timeout=10)
         r.raise_for_status()
         return r.json()
     except Exception as e:
@@ -1,21 +1,7 @@
 # src/market_report/providers/nse.py
-from typing import List, Dict, Any
-from nsetools import Nse
+import pandas as pd
 
-def _normalize_item(item: dict) -> dict:
-    # nsetools returns keys like 'symbol', 'ltp', 'previousPrice', 'netPrice', 'tradedQuantity'
-    return {
-        "symbol": item.get("symbol"),
-        "name": item.get("symbol"),
-        "ltp": item.get("ltp"),
-        "previous_close": item.get("previousPrice"),
-        "net_change": item.get("netPrice"),
-        "traded_quantity": item.get("tradedQuantity"),
-        "turnover_in_lakhs": item.get("turnoverInLakhs"),
-        "source": "nsetools"
-    }
-
-import yfinance as yf
+from market_report.providers.yahoo import download
 
 def fetch_top_gainers_and_losers(limit=5):
     tickers = [
@@ -23,26 +9,26 @@ def fetch_top_gainers_and_losers(limit=5):
         "SBIN.NS", "ITC.NS", "KOTAKBANK.NS", "LT.NS", "AXISBANK.NS"
     ]
 
-    data = yf.download(tickers, period="2d", interval="1d", group_by="ticker", progress=False)
-    results = []
+    data = download(tickers, period="2d")
 
-    for t in tickers:
-        try:
-            prev = float(data[t]["Close"].iloc[-2])
-            latest = float(data[t]["Close"].iloc[-1])
-            net_change = latest - prev
-            pct_change = ((latest - prev) / prev) * 100
+    if not isinstance(data.columns, pd.MultiIndex):  # e.g. empty frame when every ticker failed
+        return {"top_gainers": [], "top_losers": []}
 
-            results.append({
-                "symbol": t.replace(".NS", ""),  # cleaner name
-                "ltp": round(latest, 2),
-                "net_change": round(net_change, 2),
-                # remove traded_quantity since not needed
-            })
-        except Exception:
-            continue
+    try:
+        close = data.xs("Close", axis=1, level=1)
+        last, prev = close.iloc[-1], close.iloc[-2]
+    except (KeyError, IndexError):
+        return {"top_gainers": [], "top_losers": []}
 
-    sorted_res = sorted(results, key=lambda x: x["net_change"], reverse=True)
+    net = (last - prev).round(2).dropna().sort_values(ascending=False, kind="stable")
+    sorted_res = [
+        {
+            "symbol": t.replace(".NS", ""),  # cleaner symbol
+            "ltp": round(float(last[t]), 2),
+            "net_change": float(net[t]),
+        }
+        for t in net.index
+    ]
     return {
         "top_gainers": sorted_res[:limit],
         "top_losers": sorted_res[-limit:]
@@ -1,12 +1,51 @@
 # src/market_report/providers/yahoo.py
+import threading
 from typing import List, Dict, Any
 import pandas as pd
 import yfinance as yf
 
-def _two_day_close(symbol: str):
+from market_report.cache import disk_cache, has_every_close
+
+# Yahoo serves roughly 20 symbols per batched request
+BATCH_SIZE = 20
+
+# yf.download keeps per-call results in module globals, so calls made from
+# different threads must not overlap
+_YF_LOCK = threading.Lock()
+
+@disk_cache(complete=has_every_close)
+def download(symbols: List[str], period: str = "5d", interval: str = "1d") -> pd.DataFrame:
+    """Batched yf.download grouped by ticker (columns are a (symbol, field) MultiIndex)"""
+    with _YF_LOCK:
+        return yf.download(symbols, period=period, interval=interval, group_by="ticker",
+                           auto_adjust=False, threads=True, progress=False)
+
+def download_history(symbols: List[str], period: str = "5d", interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """Return {symbol: OHLC DataFrame}, fetched in batches of BATCH_SIZE symbols"""
+    frames: Dict[str, pd.DataFrame] = {}
+    for i in range(0, len(symbols), BATCH_SIZE):
+        chunk = symbols[i:i + BATCH_SIZE]
+        try:
+            data = download(chunk, period=period, interval=interval)
+        except Exception:
+            data = pd.DataFrame()
+        for sym in chunk:
+            try:
+                if not isinstance(data.columns, pd.MultiIndex):
+                    raise KeyError(sym)
+                frames[sym] = data[sym]
+            except KeyError:
+                # missing from the batch, retry on its own
+                try:
+                    with _YF_LOCK:
+                        frames[sym] = yf.Ticker(sym).history(period=period, interval=interval, auto_adjust=False)
+                except Exception:
+                    frames[sym] = pd.DataFrame()
+    return frames
+
+def _two_day_close(hist: pd.DataFrame):
     """Return (prev_close, last_close, last_date) or (None, None, None) if unavailable"""
     try:
-        hist = yf.Ticker(symbol).history(period="10d", interval="1d", auto_adjust=False)
         if hist is None or hist.empty:
             return None, None, None
         hist = hist.dropna(subset=["Close"])
@@ -23,10 +62,11 @@ def _two_day_close(symbol: str):
 
 def fetch_section(section: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
+    history = download_history([item.get("symbol") for item in items], period="10d")
     for item in items:
         sym = item.get("symbol")
         name = item.get("name", sym)
-        prev_c, close_c, as_of = _two_day_close(sym)
+        prev_c, close_c, as_of = _two_day_close(history.get(sym))
         if prev_c is None or close_c is None:
             out.append({
                 "section": section,
@@ -0,0 +1,32 @@
+# src/market_report/session.py
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from market_report.cache import CACHE_DIR, CACHE_TTL
+
+try:
+    import requests_cache
+except ImportError:  # responses are simply not cached
+    requests_cache = None
+
+def build_session() -> requests.Session:
+    """
+    Keep-alive session that retries rate-limited / flaky responses.
+    Create one per module and reuse it so TLS handshakes are paid once.
+    With requests-cache installed, responses are kept in .cache/http for CACHE_TTL.
+    """
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    if requests_cache is not None:
+        session = requests_cache.CachedSession(
+            cache_name=str(CACHE_DIR / "http"),
+            backend="sqlite",
+            expire_after=CACHE_TTL,
+            ignored_parameters=["apiKey"],  # keep the NewsAPI key out of the cache
+        )
+    else:
+        session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,78 +1,248 @@
 # src/prepare_report.py
 from __future__ import annotations
-import json, datetime
+import functools, json, mmap, os, shutil, datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+import openpyxl
 import pandas as pd
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-RAW_DIR = PROJECT_ROOT / "data" / "raw"
-PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder/decoder
+    orjson = None
 
-def load_latest_raw() -> Dict[str, Any]:
-    files = sorted(RAW_DIR.glob("markets_*.json"))
-    if not files:
-        raise FileNotFoundError("No raw JSON files found.")
-    latest = files[-1]
-    print(f"[INFO] Using raw file: {latest.name}")
-    with open(latest, "r", encoding="utf-8") as f:
+try:
+    import ijson
+except ImportError:  # without orjson too, large snapshots are loaded in one go
+    ijson = None
+
+try:
+    import xlsxwriter
+except ImportError:  # openpyxl write-only mode is used instead
+    xlsxwriter = None
+
+EXCEL_ENGINE = "xlsxwriter" if xlsxwriter is not None else "openpyxl"
+
+# Paths are resolved on first use (once per process), not at import time
+@functools.cache
+def project_root() -> Path:
+    return Path(__file__).resolve().parents[1]
+
+@functools.cache
+def raw_dir() -> Path:
+    return project_root() / "data" / "raw"
+
+@functools.cache
+def processed_dir() -> Path:
+    return project_root() / "data" / "processed"
+
+@functools.cache
+def latest_marker() -> Path:
+    # name of the newest raw snapshot, written by fetch_data
+    return raw_dir() / ".latest"
+
+NUMERIC_COLS = ["ltp", "net_change", "traded_quantity"]
+
+# sheet preparation threads; more than a few only contend for the GIL
+EXCEL_WORKERS = min(4, os.cpu_count() or 1)
+
+# raw snapshots above this size are stream-parsed (ijson installed, orjson not)
+STREAM_PARSE_BYTES = 50 * 1024 * 1024
+# above this size orjson parses straight from a read-only mapping of the file
+MMAP_PARSE_BYTES = 10 * 1024 * 1024
+
+def _orjson_load(path: Path, size: int) -> Dict[str, Any]:
+    if size <= MMAP_PARSE_BYTES:
+        return orjson.loads(path.read_bytes())
+    # parse the page cache in place rather than copying it into a bytes object
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+    finally:
+        mm.close()
+
+def _load_json(path: Path) -> Dict[str, Any]:
+    size = path.stat().st_size
+    if orjson is not None:
+        try:
+            return _orjson_load(path, size)
+        except orjson.JSONDecodeError:
+            # snapshots written by json.dump may hold bare NaN, which only the
+            # stdlib parser accepts (ijson rejects it as well)
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+    if ijson is not None and size > STREAM_PARSE_BYTES:
+        # without orjson, build the snapshot key by key instead of holding
+        # the whole file's text in memory next to the parsed objects
+        with open(path, "rb") as f:
+            return dict(ijson.kvitems(f, "", use_float=True))
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def normalize_number(x):
+def _latest_from_marker() -> Path | None:
+    """File named in .latest, unless raw_dir() gained entries after it was written"""
     try:
-        return float(x)
-    except Exception:
+        if latest_marker().stat().st_mtime_ns < raw_dir().stat().st_mtime_ns:
+            return None
+        latest = raw_dir() / latest_marker().read_text(encoding="utf-8").strip()
+    except OSError:
         return None
+    return latest if latest.is_file() else None
+
+def load_latest_raw() -> Tuple[Dict[str, Any], Path]:
+    """Return (snapshot, path of the raw file it was read from)"""
+    latest = _latest_from_marker()
+    if latest is None:
+        # names embed YYYY-MM-DD, so the greatest name is the newest snapshot
+        with os.scandir(raw_dir()) as it:
+            latest_name = max(
+                (e.name for e in it
+                 if e.name.startswith("markets_") and e.name.endswith(".json") and e.is_file()),
+                default=None,
+            )
+        if latest_name is None:
+            raise FileNotFoundError("No raw JSON files found.")
+        latest = raw_dir() / latest_name
+        try:
+            latest_marker().write_text(latest_name, encoding="utf-8")
+        except OSError:
+            pass
+    print(f"[INFO] Using raw file: {latest.name}")
+    return _load_json(latest), latest
 
-def process(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+def _same_rows(records: list, raw) -> bool:
+    """
+    records == raw as the JSON encoder sees it: key order and value types count,
+    so 100 vs 100.0 or reordered keys would not round-trip to the same bytes
+    """
+    if not isinstance(raw, list) or len(records) != len(raw):
+        return False
+    return all(
+        isinstance(b, dict) and list(a) == list(b)
+        and all(type(v) is type(b[k]) and v == b[k] for k, v in a.items())
+        for a, b in zip(records, raw)
+    )
+
+def process(snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], bool, Dict[str, int]]:
+    """
+    Normalize the snapshot in place. Also returns whether anything changed and
+    the row count of every list section, for the summary printed by main().
+    """
     sections = snapshot.get("sections", {})
+    dirty = False
 
-    # Normalize top gainers / losers
+    # Normalize top gainers / losers (column-wise, so coercion runs in C)
     for key in ["top_gainers", "top_losers"]:
-        clean_list = []
-        for row in sections.get(key, []):
-            clean_list.append({
-                "symbol": row.get("symbol", "N/A"),
-                "ltp": normalize_number(row.get("ltp")),
-                "net_change": normalize_number(row.get("net_change")),
-                "traded_quantity": normalize_number(row.get("traded_quantity")),
-            })
-        sections[key] = clean_list
+        df = pd.DataFrame(sections.get(key, []), columns=["symbol"] + NUMERIC_COLS)
+        df["symbol"] = df["symbol"].fillna("N/A")
+        for c in NUMERIC_COLS:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+        # back to plain dicts, with None rather than NaN for missing numbers
+        records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        dirty = dirty or not _same_rows(records, sections.get(key))
+        sections[key] = records
+        # keep the frame for save() so the Excel export doesn't rebuild it
+        snapshot.setdefault("_frames", {})[key] = df
 
     snapshot["sections"] = sections
-    return snapshot
+    counts = {k: len(v) for k, v in sections.items() if isinstance(v, list)}
+    return snapshot, dirty, counts
+
+def _excel_value(val):
+    # mirror pandas.to_excel: NaN -> blank cell, nested values as text
+    if isinstance(val, float) and val != val:
+        return None
+    if isinstance(val, (dict, list)):
+        return str(val)
+    return val
 
-def save(snapshot: Dict[str, Any]):
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+def _prepare_sheet(name: str, items: list, frames: Dict[str, pd.DataFrame]):
+    """(sheet_name, columns, rows) for one list section"""
+    if name in frames:  # already tabular from process()
+        df = frames[name]
+        cols = list(df.columns)
+        # plain tuples straight from the frame; NaN -> None for blank cells
+        rows = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+    else:
+        cols = list(dict.fromkeys(k for row in items for k in row))
+        rows = [[_excel_value(row.get(c)) for c in cols] for row in items]
+    return name[:31], cols, rows  # Excel caps sheet names at 31 chars
 
-    # Save JSON
-    out_json = PROCESSED_DIR / "markets_latest.json"
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+def _excel_sheets(snapshot: Dict[str, Any], frames: Dict[str, pd.DataFrame]):
+    """
+    Prepare every list section's rows on a thread pool; the workbook itself is
+    only touched by the calling thread. Returns sheets in section order.
+    """
+    todo = [(name, items) for name, items in snapshot.get("sections", {}).items()
+            if isinstance(items, list) and items]
+    with ThreadPoolExecutor(max_workers=EXCEL_WORKERS) as pool:
+        futures = [pool.submit(_prepare_sheet, name, items, frames) for name, items in todo]
+        return [f.result() for f in futures]
+
+def _write_excel_xlsxwriter(out_xlsx: Path, snapshot: Dict[str, Any], frames: Dict[str, pd.DataFrame]):
+    # constant_memory flushes each row to disk instead of holding the sheet
+    wb = xlsxwriter.Workbook(str(out_xlsx), {"constant_memory": True, "strings_to_urls": False})
+    for sheet, cols, rows in _excel_sheets(snapshot, frames):
+        ws = wb.add_worksheet(sheet)
+        ws.write_row(0, 0, cols)
+        for i, row in enumerate(rows, 1):
+            ws.write_row(i, 0, row)
+    wb.close()
+
+def _write_excel_openpyxl(out_xlsx: Path, snapshot: Dict[str, Any], frames: Dict[str, pd.DataFrame]):
+    # write-only mode streams rows without per-cell styling
+    wb = openpyxl.Workbook(write_only=True)
+    for sheet, cols, rows in _excel_sheets(snapshot, frames):
+        ws = wb.create_sheet(title=sheet)
+        ws.append(cols)
+        for row in rows:
+            ws.append(row)
+    wb.save(out_xlsx)
+
+def _encode_json(snapshot: Dict[str, Any]) -> bytes | None:
+    """Indented JSON from orjson; None means use stdlib json"""
+    if orjson is not None:
+        return orjson.dumps(snapshot, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return None
+
+def save(snapshot: Dict[str, Any], dirty: bool = True, raw_path: Path | None = None,
+         engine: str = EXCEL_ENGINE):
+    processed_dir().mkdir(parents=True, exist_ok=True)
+    # DataFrames cached by process(); never part of the JSON output
+    frames = snapshot.pop("_frames", {})
+
+    # Save JSON (byte-identical to the raw file when process() changed nothing)
+    out_json = processed_dir() / "markets_latest.json"
+    if not dirty and raw_path is not None:
+        shutil.copyfile(raw_path, out_json)
+    elif (buf := _encode_json(snapshot)) is not None:
+        out_json.write_bytes(buf)
+    else:
+        with open(out_json, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
     print(f"[OK] Wrote processed JSON: {out_json}")
 
     # Save Excel
-    out_xlsx = PROCESSED_DIR / "markets_latest.xlsx"
-    writer = pd.ExcelWriter(out_xlsx, engine="openpyxl")
-    for name, items in snapshot.get("sections", {}).items():
-        if isinstance(items, list) and items:
-            df = pd.DataFrame(items)
-            df.to_excel(writer, sheet_name=name[:30], index=False)
-    writer.close()
+    out_xlsx = processed_dir() / "markets_latest.xlsx"
+    if engine == "xlsxwriter":
+        _write_excel_xlsxwriter(out_xlsx, snapshot, frames)
+    else:
+        _write_excel_openpyxl(out_xlsx, snapshot, frames)
     print(f"[OK] Wrote Excel: {out_xlsx}")
 
 
 def main():
-    snapshot = load_latest_raw()
-    snapshot = process(snapshot)
-    save(snapshot)
+    snapshot, raw_path = load_latest_raw()
+    snapshot, dirty, counts = process(snapshot)
+    save(snapshot, dirty=dirty, raw_path=raw_path)
 
     # Summary
-    sections = snapshot.get("sections", {})
     print("\n=== Processed summary ===")
-    for k, v in sections.items():
-        if isinstance(v, list):
-            print(f"- {k}: {len(v)}")
+    for k, n in counts.items():
+        print(f"- {k}: {n}")
     print("=========================")
 
 if __name__ == "__main__":